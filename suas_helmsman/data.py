@@ -37,6 +37,8 @@ class Obstacle(object):
         self.radius = radius
         self.height = height
         self.shapely = self._equation()
+        # Bounding box used to skip exact intersection checks
+        self.bounds = self.shapely.bounds
 
     def _equation(self):
         """Returns the equation of the obstacle cylinder.
@@ -0,0 +1,203 @@
+import heapq
+from math import inf
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import networkx as nx
+
+
+class LPAStar:
+    """Incremental A* search (Lifelong Planning A*) for a single leg of the flight path.
+
+    The search keeps its g and rhs scores between calls so that when edges of the graph change,
+    only the part of the search tree affected by those edges is repaired instead of searching from scratch.
+    Edge costs are read from the `weight` attribute of the networkx graph, a missing edge is treated as blocked.
+    The heuristic must be consistent with the edge weights, otherwise the repaired path may be stale.
+    """
+
+    def __init__(
+        self, graph: nx.Graph, start: Tuple, goal: Tuple, heuristic: Callable
+    ) -> None:
+        """Constructs a LPAStar search.
+
+        Args:
+            graph (nx.Graph): The graph to search, shared with the SUASGraph
+            start (Tuple): The node the leg starts at
+            goal (Tuple): The node the leg ends at
+            heuristic (Callable): H score function taking (node, end_node)
+        """
+        self.graph = graph
+        self.start = start
+        self.goal = goal
+        self.heuristic = heuristic
+        self.g: Dict[Tuple, float] = {}
+        self.rhs: Dict[Tuple, float] = {start: 0}
+        # Priority queue with lazy deletion, self.open holds the current key of each queued node
+        self.queue: List = []
+        self.open: Dict[Tuple, Tuple[float, float]] = {}
+        self._push(start)
+
+    def _key(self, node) -> Tuple[float, float]:
+        """Calculates the priority of a node in the queue
+
+        Args:
+            node (Tuple): The node to calculate for
+
+        Returns:
+            Tuple: The key as (f score, g score)
+        """
+        score = min(self.g.get(node, inf), self.rhs.get(node, inf))
+        return (score + self.heuristic(node, self.goal), score)
+
+    def _push(self, node) -> None:
+        key = self._key(node)
+        self.open[node] = key
+        heapq.heappush(self.queue, (key, node))
+
+    def _top(self):
+        """Returns the top of the queue, dropping outdated entries
+
+        Returns:
+            Tuple: (key, node) of the lowest key, or None if the queue is empty
+        """
+        while self.queue:
+            key, node = self.queue[0]
+            if self.open.get(node) == key:
+                return key, node
+            heapq.heappop(self.queue)
+        return None
+
+    def _requeue(self, node) -> None:
+        """Queues a node if it is inconsistent, removing it otherwise
+
+        Args:
+            node (Tuple): The node to requeue
+        """
+        self.open.pop(node, None)
+        if self.g.get(node, inf) != self.rhs.get(node, inf):
+            self._push(node)
+
+    def _update_vertex(self, node) -> None:
+        """Recalculates the rhs score of a node from all of its edges and requeues it
+
+        Args:
+            node (Tuple): The node to update
+        """
+        if node != self.start:
+            edges = self.graph[node].items() if node in self.graph else []
+            self.rhs[node] = min(
+                (self.g.get(n, inf) + data["weight"] for n, data in edges),
+                default=inf,
+            )
+        self._requeue(node)
+
+    def _relax(self, node, other, weight) -> None:
+        """Lowers the rhs score of other if the path through node is cheaper
+
+        Args:
+            node (Tuple): The node with a known g score
+            other (Tuple): The node to update
+            weight (float): The cost of the edge between them
+        """
+        score = self.g.get(node, inf) + weight
+        if other != self.start and score < self.rhs.get(other, inf):
+            self.rhs[other] = score
+            self._requeue(other)
+
+    def compute_shortest_path(self) -> None:
+        """Expands inconsistent nodes until the goal is consistent.
+
+        On the first call this is equivalent to an A* search,
+        after edge updates only the nodes whose scores changed are expanded.
+        """
+        while True:
+            top = self._top()
+            goal_rhs = self.rhs.get(self.goal, inf)
+            goal_g = self.g.get(self.goal, inf)
+            if top is None or (top[0] >= self._key(self.goal) and goal_rhs == goal_g):
+                break
+            _, node = top
+            heapq.heappop(self.queue)
+            del self.open[node]
+            if node not in self.graph:
+                # Node was removed from the graph, it can no longer be reached
+                self.g.pop(node, None)
+                continue
+            if self.g.get(node, inf) > self.rhs.get(node, inf):
+                # Overconsistent, the node got cheaper so neighbours can only get cheaper
+                self.g[node] = self.rhs[node]
+                for n, data in self.graph[node].items():
+                    self._relax(node, n, data["weight"])
+            else:
+                # Underconsistent, the node got more expensive,
+                # only neighbours whose rhs came through it need a full rescan
+                old = self.g[node]
+                self.g[node] = inf
+                for n, data in self.graph[node].items():
+                    if n != self.start and self.rhs.get(n, inf) == old + data["weight"]:
+                        self._update_vertex(n)
+                self._update_vertex(node)
+
+    def update_edges(self, edges: Iterable[Tuple[Tuple, Tuple]]) -> None:
+        """Notifies the search that edges were added or removed.
+
+        The graph should already contain the change.
+
+        Args:
+            edges (Iterable[Tuple]): The (node, other) pairs that changed
+        """
+        # An edge only changes the rhs score of a node if the other end was reached,
+        # added edges can only lower it while removed edges need a full rescan
+        removed = set()
+        for node, other in edges:
+            for a, b in ((node, other), (other, node)):
+                if self.g.get(a, inf) == inf:
+                    continue
+                if self.graph.has_edge(a, b):
+                    self._relax(a, b, self.graph[a][b]["weight"])
+                else:
+                    removed.add(b)
+        for node in removed:
+            self._update_vertex(node)
+
+    def path(self) -> List[Tuple]:
+        """Returns the current shortest path, repairing the search first.
+
+        Raises:
+            nx.NetworkXNoPath: If the goal can not be reached from the start
+
+        Returns:
+            List[Tuple]: The nodes from start to goal
+        """
+        self.compute_shortest_path()
+        if self.g.get(self.goal, inf) == inf:
+            raise nx.NetworkXNoPath(
+                "Node {} not reachable from {}".format(self.goal, self.start)
+            )
+        # Walk back from the goal through the cheapest predecessor,
+        # requiring g to decrease so that the walk always ends at the start
+        path = [self.goal]
+        node = self.goal
+        while node != self.start:
+            best = None
+            best_score = inf
+            for n, data in self.graph[node].items():
+                score = self.g.get(n, inf) + data["weight"]
+                if self.g.get(n, inf) < self.g[node] and score < best_score:
+                    best, best_score = n, score
+            if best is None:
+                raise nx.NetworkXNoPath(
+                    "Node {} not reachable from {}".format(self.goal, self.start)
+                )
+            path.append(best)
+            node = best
+        path.reverse()
+        return path
+
+    def path_length(self) -> float:
+        """Returns the cost of the current shortest path, repairing the search first.
+
+        Returns:
+            float: The path cost
+        """
+        path = self.path()
+        return sum(self.graph[u][v]["weight"] for u, v in zip(path, path[1:]))
@@ -1,11 +1,16 @@
 import itertools
 from math import pi, sqrt, tan
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import networkx as nx
 from pygeodesy.ecef import EcefCartesian
 from shapely.geometry import LinearRing, LineString, Point, Polygon
+from shapely.prepared import prep
 
 from suas_helmsman.data import Obstacle, Waypoint
+from suas_helmsman.lpa_star import LPAStar
+
+# Distance in meters that points on the boundary ring may be outside of it when replanning
+BOUNDARY_TOLERANCE = 0.01
 
 
 class SUASGraph:
@@ -16,12 +21,16 @@ class SUASGraph:
     This graph is generated in cartesian coordinates with (0, 0) being the lost coms point with all distances being feet.
     """
 
-    def __init__(self, starting_point, alt_bounds) -> None:
+    def __init__(self, starting_point, alt_bounds, replanning=False) -> None:
         """Constructs a SUASGraph.
 
         Args:
             starting_point (Dictionary): A starting point within the bounds
             alt_bounds (Dictionary): the altitude bounds
+            replanning (bool): Keep the search state of each leg so replans only repair what changed.
+                The searches only know about changes made through replan_obstacles and replan_boundaries,
+                add_edges resets them so the graph can be rebuilt from scratch.
+                On small dense graphs a fresh A* search can be faster than the repair.
         """
         self.starting_point = starting_point
         # Cartesian Coordiates System centered at lost coms point
@@ -38,10 +47,16 @@ class SUASGraph:
         self.boundaries: List[Point] = []
         self.boundary_ring: LinearRing = None
         self.boundary_poly: Polygon = None
+        self.boundary_area = None
         self.drop: Optional[Point] = None
+        self.drop_node: Optional[Tuple] = None
         self.off_axis: Optional[Point] = None
         self.off_axis_optimal: Optional[Point] = None
+        self.off_axis_node: Optional[Tuple] = None
         self.path: List[Tuple] = []
+        # Incremental searches for each leg, keyed by (start, goal)
+        self.replanning = replanning
+        self.planners: Dict[Tuple[Tuple, Tuple], LPAStar] = {}
 
     def add_boundaries(self, bounds) -> None:
         """Adds the flight boundary points to the graph.
@@ -62,6 +77,8 @@ class SUASGraph:
             self.boundaries.append(Point(x, y))
         self.boundary_ring = LinearRing(self.boundaries)
         self.boundary_poly = Polygon(self.boundaries)
+        # Slightly larger than the boundary so points on the ring can be connected when replanning
+        self.boundary_area = prep(self.boundary_poly.buffer(BOUNDARY_TOLERANCE))
 
     def add_waypoints(self, way) -> None:
         """Adds the waypoints to the graph.
@@ -106,8 +123,13 @@ class SUASGraph:
         # Convert each bound to xy coordinate
         # Forward converts from latlon to cartesian
         x, y, *_ = self.cartesian.forward(off["latitude"], off["longitude"])
-        point = Point(x, y, 0)
+        # Add actual off axis point
+        self.off_axis = Point(x, y, 0)
+        self._place_off_axis()
 
+    def _place_off_axis(self) -> None:
+        """Generates the optimal off axis point on the boundary and adds it to the graph"""
+        point = self.off_axis
         # Find the optimal off axis point by interpolating the point onto the ring
         off_point = self.boundary_ring.interpolate(self.boundary_ring.project(point))
         # Calculate the height of the point
@@ -115,11 +137,12 @@ class SUASGraph:
         z = min(dis * tan(75 * pi / 180), 325)
         # Add optimal point to graph
         self.off_axis_optimal = Point(off_point.x, off_point.y, z)
-        self.graph.add_node(
-            (self.off_axis_optimal.x, self.off_axis_optimal.y, self.off_axis_optimal.z)
+        self.off_axis_node = (
+            self.off_axis_optimal.x,
+            self.off_axis_optimal.y,
+            self.off_axis_optimal.z,
         )
-        # Add actual off axis point
-        self.off_axis = point
+        self.graph.add_node(self.off_axis_node)
 
     def add_drop(self, drop) -> None:
         """Adds the optimal drop point to the graph
@@ -132,7 +155,8 @@ class SUASGraph:
         x, y, *_ = self.cartesian.forward(drop["latitude"], drop["longitude"])
         # Add point to graph
         self.drop = Point(x, y, 500)
-        self.graph.add_node((self.drop.x, self.drop.y, self.drop.z))
+        self.drop_node = (self.drop.x, self.drop.y, self.drop.z)
+        self.graph.add_node(self.drop_node)
 
     def add_edges(self) -> None:
         """Constructs all possible fly paths for the plane.
@@ -141,42 +165,251 @@ class SUASGraph:
         A path is valid if it does not pass through an obstacle and has less than a 15% incline
         """
         print(self.graph.number_of_nodes())
+        # Searches from a previous graph would be stale
+        self.planners = {}
         counter = 0
         for node, other in itertools.product(self.graph, self.graph):
             # Check to see if graph already has edge
             if node is other or self.graph.has_edge(node, other):
                 continue
-            # Calculate slopes
-            slopexz = (
-                abs((other[2] - node[2]) / (other[0] - node[0]))
-                if other[0] - node[0] != 0
-                else 2
-            )
-            slopeyz = (
-                abs((other[2] - node[2]) / (other[1] - node[1]))
-                if other[1] - node[1] != 0
-                else 2
-            )
-            if slopexz >= 0.9 and slopeyz >= 0.9:
-                continue
             # Add edges to graph
-            seg = LineString([node, other])
-            if len(self.obstacles) == 0:
-                # If there are no edges then all edges
-                self.graph.add_edge(node, other, weight=seg.length)
-            # Compare each potential path to obstacles to see if valid
-            inter = not self.boundary_ring.intersection(seg).is_empty
-            for o in self.obstacles:
-                if inter or solve_intersection(o, seg):
-                    inter = True
-                    break
-            if not inter:
-                self.graph.add_edge(node, other, weight=seg.length)
+            if self._valid_edge(node, other):
+                self.graph.add_edge(
+                    node, other, weight=LineString([node, other]).length
+                )
             counter += 1  #
             if counter % 10000 == 0:
                 print(counter)
         print(len(self.graph.edges()))
 
+    def _valid_edge(self, node, other) -> bool:
+        """Checks if the plane can fly directly between two points.
+
+        Args:
+            node (Tuple): Initial Point
+            other (Tuple): Final Point
+
+        Returns:
+            Bool: True if the edge is valid, False otherwise
+        """
+        if not valid_slope(node, other):
+            return False
+        if len(self.obstacles) == 0:
+            # If there are no obstacles then all edges are valid
+            return True
+        # Compare each potential path to the boundary and obstacles to see if valid
+        seg = LineString([node, other])
+        if not self.boundary_ring.intersection(seg).is_empty:
+            return False
+        return not any(solve_intersection(o, seg) for o in self.obstacles)
+
+    def _valid_replan_edge(self, node, other) -> bool:
+        """Checks if the plane can fly directly between two points when replanning.
+
+        Unlike add_edges the boundary is always checked, even without obstacles,
+        and points on the boundary ring, like the off axis point, are treated as inside.
+
+        Args:
+            node (Tuple): Initial Point
+            other (Tuple): Final Point
+
+        Returns:
+            Bool: True if the edge is valid, False otherwise
+        """
+        if not valid_slope(node, other):
+            return False
+        seg = LineString([node, other])
+        if not self.boundary_area.contains(seg):
+            return False
+        return not any(
+            solve_intersection(o, seg)
+            for o in self.obstacles
+            if envelope_overlaps(node, other, o.bounds)
+        )
+
+    def _connect(self, nodes) -> List[Tuple]:
+        """Adds every valid edge from the given nodes to the rest of the graph.
+
+        Args:
+            nodes (Iterable[Tuple]): The nodes to connect
+
+        Returns:
+            List[Tuple]: The (node, other) edges that were added
+        """
+        changed = []
+        for node in nodes:
+            for other in list(self.graph):
+                if node == other or self.graph.has_edge(node, other):
+                    continue
+                if self._valid_replan_edge(node, other):
+                    self.graph.add_edge(
+                        node, other, weight=LineString([node, other]).length
+                    )
+                    changed.append((node, other))
+        return changed
+
+    def _remove_node(self, node) -> List[Tuple]:
+        """Removes a node from the graph along with any search that starts or ends at it.
+
+        Args:
+            node (Tuple): The node to remove
+
+        Returns:
+            List[Tuple]: The (node, other) edges that were removed
+        """
+        changed = [(node, other) for other in self.graph[node]]
+        self.graph.remove_node(node)
+        for leg in [leg for leg in self.planners if node in leg]:
+            del self.planners[leg]
+        return changed
+
+    def replan_obstacles(self, obs) -> None:
+        """Adds obstacles reported after the path was constructed and replans the path.
+
+        Edges blocked by the new obstacles are removed and the new obstacle points are connected to the graph.
+        Only the legs affected by the changed edges are searched again when replanning is enabled.
+
+        Args:
+            obs (Dictionary): Dictionary of lat lon points
+
+        Raises:
+            nx.NetworkXNoPath: If a point of interest can no longer be reached, path is left empty
+        """
+        nodes = set(self.graph)
+        count = len(self.obstacles)
+        self.add_obstacles(obs)
+        changed = []
+        # Remove edges that pass through the new obstacles
+        for node, other in list(self.graph.edges()):
+            # Only edges whose envelope overlaps an obstacle can pass through it
+            near = [
+                o
+                for o in self.obstacles[count:]
+                if envelope_overlaps(node, other, o.bounds)
+            ]
+            if not near:
+                continue
+            seg = LineString([node, other])
+            if any(solve_intersection(o, seg) for o in near):
+                self.graph.remove_edge(node, other)
+                changed.append((node, other))
+        # Connect the new obstacle points
+        changed.extend(self._connect(set(self.graph) - nodes))
+        self._replan(changed)
+
+    def replan_boundaries(self, bounds) -> None:
+        """Replaces the flight boundary after the path was constructed and replans the path.
+
+        Edges that cross the new boundary are removed, obstacle points are filtered by the new boundary
+        and the optimal off axis point is projected onto the new boundary.
+        Edges between existing points made valid by a larger boundary are not added,
+        call add_edges and construct_path for that.
+
+        Waypoints and the drop point are not moved, if one is outside the new boundary
+        it loses all of its edges and construct_path raises NetworkXNoPath.
+
+        Args:
+            bounds (Dictionary): Dictionary of lat lon points
+
+        Raises:
+            nx.NetworkXNoPath: If a point of interest can no longer be reached, path is left empty
+        """
+        self.boundaries = []
+        self.add_boundaries(bounds)
+        changed = []
+        new_nodes = set()
+        # Filter obstacle points by the new boundary
+        for o in self.obstacles:
+            for n in o.points():
+                inside = self.boundary_poly.contains(Point(*n))
+                if n in self.graph and not inside:
+                    changed.extend(self._remove_node(n))
+                elif n not in self.graph and inside:
+                    self.graph.add_node(n)
+                    new_nodes.add(n)
+        # Move the optimal off axis point onto the new boundary
+        if self.off_axis != None:
+            changed.extend(self._remove_node(self.off_axis_node))
+            self._place_off_axis()
+            new_nodes.add(self.off_axis_node)
+        # Existing edges already passed the slope and obstacle checks,
+        # so they are only invalid if they leave the new boundary
+        inside = {n: self.boundary_area.contains(Point(n)) for n in self.graph}
+        coords = list(self.boundary_ring.coords)
+        sides = [
+            LineString(side).buffer(BOUNDARY_TOLERANCE).bounds
+            for side in zip(coords, coords[1:])
+        ]
+        for node, other in list(self.graph.edges()):
+            # An edge between inside points can only leave if it is near a side
+            if (
+                inside[node]
+                and inside[other]
+                and not any(envelope_overlaps(node, other, b) for b in sides)
+            ):
+                continue
+            if not self.boundary_area.contains(LineString([node, other])):
+                self.graph.remove_edge(node, other)
+                changed.append((node, other))
+        changed.extend(self._connect(new_nodes))
+        self._replan(changed)
+
+    def _replan(self, changed) -> None:
+        """Notifies each leg's search of the changed edges and reconstructs the path.
+
+        Args:
+            changed (List[Tuple]): The (node, other) edges that were added or removed
+        """
+        for planner in self.planners.values():
+            planner.update_edges(changed)
+        # Do not keep a path through the old graph if the new one can not be found
+        self.path = []
+        self.construct_path()
+
+    def _planner(self, start, goal) -> LPAStar:
+        """Returns the incremental search for a leg, creating it if needed
+
+        Args:
+            start (Tuple): The node the leg starts at
+            goal (Tuple): The node the leg ends at
+
+        Returns:
+            LPAStar: The search for the leg
+        """
+        if (start, goal) not in self.planners:
+            self.planners[(start, goal)] = LPAStar(
+                self.graph, start, goal, planar_heuristic
+            )
+        return self.planners[(start, goal)]
+
+    def _leg_path(self, start, goal) -> List[Tuple]:
+        """Finds the path of a single leg.
+
+        Args:
+            start (Tuple): The node the leg starts at
+            goal (Tuple): The node the leg ends at
+
+        Returns:
+            List[Tuple]: The nodes from start to goal
+        """
+        if self.replanning:
+            return self._planner(start, goal).path()
+        return nx.astar_path(self.graph, start, goal, heuristic)
+
+    def _leg_length(self, start, goal) -> float:
+        """Finds the path length of a single leg.
+
+        Args:
+            start (Tuple): The node the leg starts at
+            goal (Tuple): The node the leg ends at
+
+        Returns:
+            float: The path cost
+        """
+        if self.replanning:
+            return self._planner(start, goal).path_length()
+        return nx.astar_path_length(self.graph, start, goal, heuristic)
+
     def construct_path(self) -> None:
         """Constructs the flight path using the A* Algorithm.
         This is done in this order:
@@ -191,11 +424,8 @@ class SUASGraph:
         for i in range(len(self.waypoints) - 1):
             seg = []
             seg.extend(
-                nx.astar_path(
-                    self.graph,
-                    *self.waypoints[i].point.coords,
-                    *self.waypoints[i + 1].point.coords,
-                    heuristic
+                self._leg_path(
+                    *self.waypoints[i].point.coords, *self.waypoints[i + 1].point.coords
                 )
             )
             print(i, seg, self.graph.has_edge(seg[0], seg[len(seg) - 1]))
@@ -213,69 +443,29 @@ class SUASGraph:
                 off_check = True
                 self.off_axis_optimal = off_point
         if self.drop != None:
-            drop_point = ring.interpolate(ring.project(self.drop))
-            drop_dis = drop_point.distance(self.drop)
+            drop = Point(self.drop_node)
+            drop_point = ring.interpolate(ring.project(drop))
+            drop_dis = drop_point.distance(drop)
             if drop_dis < 15:
                 drop_check = True
                 self.drop = drop_point
         seg = []
         # Generate remaining POIs
         if not off_check and not drop_check:
-            off_drop_dis = nx.astar_path_length(
-                self.graph,
-                path[len(path) - 1],
-                *self.off_axis_optimal.coords,
-                heuristic
-            )
-            drop_off_dis = nx.astar_path_length(
-                self.graph, path[len(path) - 1], *self.drop.coords, heuristic
-            )
+            off_drop_dis = self._leg_length(path[len(path) - 1], self.off_axis_node)
+            drop_off_dis = self._leg_length(path[len(path) - 1], self.drop_node)
             if off_drop_dis < drop_off_dis:
                 seg.extend(
-                    nx.astar_path(
-                        self.graph,
-                        path[len(path) - 1],
-                        *self.off_axis_optimal.coords,
-                        heuristic
-                    )[1:]
-                )
-                seg.extend(
-                    nx.astar_path(
-                        self.graph,
-                        *self.off_axis_optimal.coords,
-                        *self.drop.coords,
-                        heuristic
-                    )[1:]
+                    self._leg_path(path[len(path) - 1], self.off_axis_node)[1:]
                 )
+                seg.extend(self._leg_path(self.off_axis_node, self.drop_node)[1:])
             else:
-                seg.extend(
-                    nx.astar_path(
-                        self.graph, path[len(path) - 1], *self.drop.coords, heuristic
-                    )[1:]
-                )
-                seg.extend(
-                    nx.astar_path(
-                        self.graph,
-                        *self.drop.coords,
-                        *self.off_axis_optimal.coords,
-                        heuristic
-                    )[1:]
-                )
+                seg.extend(self._leg_path(path[len(path) - 1], self.drop_node)[1:])
+                seg.extend(self._leg_path(self.drop_node, self.off_axis_node)[1:])
         elif not off_check:
-            seg.extend(
-                nx.astar_path(
-                    self.graph,
-                    path[len(path) - 1],
-                    *self.off_axis_optimal.coords,
-                    heuristic
-                )[1:]
-            )
+            seg.extend(self._leg_path(path[len(path) - 1], self.off_axis_node)[1:])
         elif not drop_check:
-            seg.extend(
-                nx.astar_path(
-                    self.graph, path[len(path) - 1], *self.drop.coords, heuristic
-                )[1:]
-            )
+            seg.extend(self._leg_path(path[len(path) - 1], self.drop_node)[1:])
         path.extend(seg)
         self.path = path
 
@@ -326,6 +516,68 @@ def heuristic(node, end_node) -> float:
     )
 
 
+def valid_slope(node, other) -> bool:
+    """Checks if the incline between two points is flyable
+
+    Args:
+        node (Tuple): Initial Point
+        other (Tuple): Final Point
+
+    Returns:
+        Bool: True if the incline is flyable, False otherwise
+    """
+    # Calculate slopes
+    slopexz = (
+        abs((other[2] - node[2]) / (other[0] - node[0]))
+        if other[0] - node[0] != 0
+        else 2
+    )
+    slopeyz = (
+        abs((other[2] - node[2]) / (other[1] - node[1]))
+        if other[1] - node[1] != 0
+        else 2
+    )
+    return slopexz < 0.9 or slopeyz < 0.9
+
+
+def envelope_overlaps(node, other, bounds) -> bool:
+    """Checks if the bounding box of an edge overlaps a bounding box
+
+    Used to skip exact intersection checks for edges that are far away
+
+    Args:
+        node (Tuple): Initial Point
+        other (Tuple): Final Point
+        bounds (Tuple): (minx, miny, maxx, maxy) as given by shapely
+
+    Returns:
+        Bool: True if the boxes overlap, False otherwise
+    """
+    minx, miny, maxx, maxy = bounds
+    return (
+        min(node[0], other[0]) <= maxx
+        and max(node[0], other[0]) >= minx
+        and min(node[1], other[1]) <= maxy
+        and max(node[1], other[1]) >= miny
+    )
+
+
+def planar_heuristic(node, end_node) -> float:
+    """Heuristic Function used in LPAStar as H score
+
+    Measures the straight line distance from the end point in the xy plane,
+    matching the edge weights so that the heuristic stays consistent
+
+    Args:
+        node (Tuple): Initial Point
+        end_node (Tuple): Final Point
+
+    Returns:
+        float: H score
+    """
+    return sqrt((node[0] - end_node[0]) ** 2 + (node[1] - end_node[1]) ** 2)
+
+
 def solve_intersection(o: Obstacle, seg: LineString) -> bool:
     """Solves the intersection between an obstacle and a LineString
 
@@ -336,5 +588,4 @@ def solve_intersection(o: Obstacle, seg: LineString) -> bool:
     Returns:
         Bool: False if no intersection, True otherwise
     """
-    inters = o.shapely.intersection(seg)
-    return not inters.is_empty
+    return o.shapely.intersects(seg)
@@ -0,0 +1,72 @@
+import networkx as nx
+import pytest
+
+from suas_helmsman.lpa_star import LPAStar
+from suas_helmsman.suas_graph import planar_heuristic
+
+
+def make_graph():
+    """Builds a small grid graph with planar edge weights."""
+    graph = nx.Graph()
+    for x in range(4):
+        for y in range(4):
+            for dx, dy in ((1, 0), (0, 1), (1, 1)):
+                if x + dx < 4 and y + dy < 4:
+                    add_edge(graph, (x, y, 0), (x + dx, y + dy, 0))
+    return graph
+
+
+def add_edge(graph, node, other):
+    graph.add_edge(node, other, weight=planar_heuristic(node, other))
+
+
+def check(planner, graph):
+    path = planner.path()
+    assert path[0] == planner.start and path[-1] == planner.goal
+    assert all(graph.has_edge(u, v) for u, v in zip(path, path[1:]))
+    assert planner.path_length() == pytest.approx(
+        nx.dijkstra_path_length(graph, planner.start, planner.goal)
+    )
+
+
+def test_matches_fresh_search():
+    graph = make_graph()
+    planner = LPAStar(graph, (0, 0, 0), (3, 3, 0), planar_heuristic)
+    check(planner, graph)
+
+
+def test_edge_removal():
+    graph = make_graph()
+    planner = LPAStar(graph, (0, 0, 0), (3, 3, 0), planar_heuristic)
+    path = planner.path()
+    changed = list(zip(path, path[1:]))
+    graph.remove_edges_from(changed)
+    planner.update_edges(changed)
+    check(planner, graph)
+
+
+def test_edge_addition():
+    graph = make_graph()
+    planner = LPAStar(graph, (0, 0, 0), (3, 0, 0), planar_heuristic)
+    graph.remove_edges_from([((1, 0, 0), (2, 0, 0)), ((1, 0, 0), (2, 1, 0))])
+    planner.update_edges([((1, 0, 0), (2, 0, 0)), ((1, 0, 0), (2, 1, 0))])
+    check(planner, graph)
+    add_edge(graph, (1, 0, 0), (2, 0, 0))
+    planner.update_edges([((1, 0, 0), (2, 0, 0))])
+    check(planner, graph)
+    assert planner.path_length() == pytest.approx(3)
+
+
+def test_unreachable_goal():
+    graph = make_graph()
+    planner = LPAStar(graph, (0, 0, 0), (3, 3, 0), planar_heuristic)
+    planner.path()
+    changed = [((3, 3, 0), other) for other in list(graph[(3, 3, 0)])]
+    graph.remove_edges_from(changed)
+    planner.update_edges(changed)
+    with pytest.raises(nx.NetworkXNoPath):
+        planner.path()
+    # Reconnecting the goal repairs the search
+    add_edge(graph, (2, 2, 0), (3, 3, 0))
+    planner.update_edges([((2, 2, 0), (3, 3, 0))])
+    check(planner, graph)
@@ -0,0 +1,100 @@
+import pytest
+from shapely.geometry import LineString, Point
+
+from suas_helmsman import SUASGraph
+from suas_helmsman.suas_graph import solve_intersection
+
+LOST_COMMS = {"latitude": 38.145, "longitude": -76.428}
+
+
+def bounds(scale):
+    """A square boundary around the lost comms point, about 1100m wide at scale 1"""
+    return [
+        {
+            "latitude": LOST_COMMS["latitude"] + dlat * 0.005 * scale,
+            "longitude": LOST_COMMS["longitude"] + dlon * 0.0063 * scale,
+        }
+        for dlat, dlon in ((-1, -1), (-1, 1), (1, 1), (1, -1))
+    ]
+
+
+WAYPOINTS = [
+    {"latitude": 38.1425, "longitude": -76.4305, "altitude": 200},
+    {"latitude": 38.1475, "longitude": -76.4255, "altitude": 250},
+    {"latitude": 38.1425, "longitude": -76.4255, "altitude": 200},
+]
+OBSTACLES = [{"latitude": 38.1492, "longitude": -76.433, "radius": 80, "height": 300}]
+# Sits on the straight line between the first two waypoints
+NEW_OBSTACLE = {"latitude": 38.145, "longitude": -76.428, "radius": 150, "height": 400}
+OFF_AXIS = {"latitude": 38.145, "longitude": -76.422}
+
+
+def make_graph(obstacles, replanning=True):
+    g = SUASGraph(LOST_COMMS, (100, 750), replanning)
+    g.add_boundaries(bounds(1))
+    g.add_waypoints(WAYPOINTS)
+    g.add_obstacles(obstacles)
+    g.add_edges()
+    g.construct_path()
+    return g
+
+
+def path_length(g):
+    return sum(LineString([u, v]).length for u, v in zip(g.path, g.path[1:]))
+
+
+def test_replan_obstacles_matches_rebuild():
+    g = make_graph(OBSTACLES)
+    g.replan_obstacles([NEW_OBSTACLE])
+
+    new = g.obstacles[-1]
+    assert not any(
+        solve_intersection(new, LineString([u, v])) for u, v in zip(g.path, g.path[1:])
+    )
+    fresh = make_graph(OBSTACLES + [NEW_OBSTACLE])
+    assert path_length(g) == pytest.approx(path_length(fresh))
+    assert len(g.path_lat_lon_alt()) == len(g.path)
+
+
+def test_replan_without_planners_matches():
+    g = make_graph(OBSTACLES, replanning=False)
+    g.replan_obstacles([NEW_OBSTACLE])
+
+    assert g.planners == {}
+    new = g.obstacles[-1]
+    assert not any(
+        solve_intersection(new, LineString([u, v])) for u, v in zip(g.path, g.path[1:])
+    )
+
+
+def test_replan_boundaries():
+    g = SUASGraph(LOST_COMMS, (100, 750), True)
+    g.add_boundaries(bounds(1))
+    g.add_waypoints(WAYPOINTS)
+    g.add_obstacles(OBSTACLES)
+    g.add_edges()
+    g.construct_path()
+    # add_edges does not connect points exactly on the ring, so the replan has to
+    g.add_off_axis(OFF_AXIS)
+    old_off_axis = g.off_axis_node
+    obstacle_points = [n for n in g.obstacles[0].points() if n in g.graph]
+    assert obstacle_points
+
+    # Shrinks the boundary past the obstacle but keeps the waypoints inside
+    g.replan_boundaries(bounds(0.7))
+
+    assert not any(n in g.graph for n in obstacle_points)
+    for node, other in g.graph.edges():
+        assert g.boundary_area.contains(LineString([node, other]))
+    # The off axis point is moved onto the new boundary and connected
+    assert old_off_axis not in g.graph
+    assert g.boundary_ring.distance(Point(g.off_axis_node)) < 1e-6
+    assert g.graph.degree(g.off_axis_node) > 0
+    assert all(old_off_axis not in leg for leg in g.planners)
+
+
+def test_add_edges_resets_planners():
+    g = make_graph(OBSTACLES)
+    assert g.planners
+    g.add_edges()
+    assert g.planners == {}
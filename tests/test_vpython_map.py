@@ -0,0 +1,76 @@
+import argparse
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# vpython-map.py is a script, so it is loaded from its path
+spec = importlib.util.spec_from_file_location("vpython_map", ROOT / "vpython-map.py")
+vpython_map = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(vpython_map)
+
+
+def make_edges(count):
+    return [((i, 0, 0), (i, j, 0)) for i in range(count // 10) for j in range(1, 11)]
+
+
+def trail_edges(trails):
+    return [frozenset(e) for trail in trails for e in zip(trail, trail[1:])]
+
+
+def test_trails_cover_each_edge_once():
+    edges = make_edges(500) + [((0, 1, 0), (1, 1, 0)), ((1, 1, 0), (2, 3, 0))]
+    covered = trail_edges(vpython_map.edge_trails(edges, 0))
+    assert len(covered) == len(edges)
+    assert set(covered) == {frozenset(e) for e in edges}
+
+
+@pytest.mark.parametrize("count, max_edges", [(7960, 5000), (500, 499), (500, 1)])
+def test_trails_respect_max_edges(count, max_edges):
+    edges = make_edges(count)
+    covered = trail_edges(vpython_map.edge_trails(edges, max_edges))
+    assert len(covered) == len(set(covered)) == max_edges
+    assert set(covered) <= {frozenset(e) for e in edges}
+
+
+def test_max_edges_rejects_negative():
+    with pytest.raises(argparse.ArgumentTypeError):
+        vpython_map.max_edges_type("-1")
+    assert vpython_map.max_edges_type("0") == 0
+
+
+def test_dump_round_trips_through_load(tmp_path):
+    with open(ROOT / "test-files" / "suas_2019_missions.json") as json_file:
+        interop_data = json.load(json_file)
+    interop_data["autogenPoints"] = interop_data["waypoints"]
+    # All of the show toggles are off, so everything is shown
+    args = argparse.Namespace(
+        lost_comms=False,
+        boundaries=False,
+        waypoints=False,
+        search_grid=False,
+        off_axis=False,
+        emergentLKP=False,
+        drop=False,
+        obstacles=False,
+        autogen=False,
+        graph=False,
+        max_edges=0,
+        dump=str(tmp_path / "scene.json"),
+    )
+    scene = vpython_map.build_scene(interop_data, args)
+    vpython_map.dump_scene(scene, args.dump)
+    loaded = vpython_map.load_scene(args.dump)
+
+    assert loaded.keys() == scene.keys()
+    for key in scene:
+        assert len(loaded[key]) == len(scene[key])
+    assert len(loaded["spheres"]) == 4 + len(interop_data["waypoints"])
+    # Coordinates are rounded to a tenth of a meter
+    path = zip(scene["curves"][0]["points"], loaded["curves"][0]["points"])
+    for original, dumped in path:
+        assert dumped == pytest.approx(original, abs=0.05)
+    assert loaded["cylinders"][0]["color"] == "yellow"
@@ -1,8 +1,196 @@
 from pygeodesy.ecef import EcefCartesian
 from suas_helmsman.data import feet_to_meters
+from contextlib import redirect_stdout
 import json
 import argparse
-from vpython import *
+import sys
+
+
+def edge_trails(edges, max_edges):
+    """Batches graph edges into as few connected polylines as possible.
+
+    Each trail walks unused edges until it gets stuck, so one curve object can draw many edges.
+    Dense edge sets are decimated by keeping evenly spaced edges.
+
+    Args:
+        edges (List[Tuple]): The (node, other) edges of the graph
+        max_edges (int): Maximum number of edges to keep, 0 keeps all
+
+    Returns:
+        List[List[Tuple]]: Lists of (x, y, z) points
+    """
+    edges = list(edges)
+    if max_edges > 0 and len(edges) > max_edges:
+        edges = [edges[i * len(edges) // max_edges] for i in range(max_edges)]
+    # Adjacency of unused edges
+    adj = {}
+    for node, other in edges:
+        adj.setdefault(node, set()).add(other)
+        adj.setdefault(other, set()).add(node)
+    trails = []
+    for start in list(adj):
+        while adj[start]:
+            trail = [start]
+            node = start
+            while adj[node]:
+                other = adj[node].pop()
+                adj[other].discard(node)
+                trail.append(other)
+                node = other
+            trails.append(trail)
+    return trails
+
+
+def build_scene(interop_data, parsed_args):
+    """Converts the interop data into a scene of simple primitives.
+
+    The scene only holds plain lists and numbers so it can be dumped to JSON or rendered with VPython.
+
+    Args:
+        interop_data (Dictionary): JSON file of the interop data
+        parsed_args (argparse.Namespace): The parsed arguments, used to determine what to show
+
+    Returns:
+        Dictionary: Lists of spheres, cylinders, extrusions and curves
+    """
+    scene = {"spheres": [], "cylinders": [], "extrusions": [], "curves": []}
+    cartesian = EcefCartesian(
+        interop_data["lostCommsPos"]["latitude"],
+        interop_data["lostCommsPos"]["longitude"],
+    )
+
+    def add_sphere(pos, color):
+        x, y, *_ = cartesian.forward(pos["latitude"], pos["longitude"])
+        scene["spheres"].append(
+            {"pos": [x, y, pos.get("altitude", 0)], "radius": 25, "color": color}
+        )
+
+    if not parsed_args.lost_comms:
+        add_sphere(interop_data["lostCommsPos"], "red")
+
+    if not parsed_args.boundaries:
+        bounds = []
+        for b in interop_data["flyZones"][0]["boundaryPoints"]:
+            x, y, *_ = cartesian.forward(b["latitude"], b["longitude"])
+            bounds.append([x, y])
+        scene["extrusions"].append(
+            {
+                "shape": bounds,
+                "path": [[0, 0, interop_data["flyZones"][0]["altitudeMax"]], [0, 0, 0]],
+                "color": "red",
+                "opacity": 0.4,
+            }
+        )
+
+    if not parsed_args.waypoints:
+        for w in interop_data["waypoints"]:
+            add_sphere(w, "green")
+
+    if not parsed_args.search_grid:
+        sg = []
+        for s in interop_data["searchGridPoints"]:
+            x, y, *_ = cartesian.forward(s["latitude"], s["longitude"])
+            sg.append([x, y])
+        scene["extrusions"].append(
+            {
+                "shape": sg,
+                "path": [[0, 0, 0], [0, 0, -1]],
+                "color": "blue",
+                "opacity": 0.4,
+            }
+        )
+
+    if not parsed_args.off_axis:
+        add_sphere(dict(interop_data["offAxisOdlcPos"], altitude=0), "purple")
+
+    if not parsed_args.emergentLKP:
+        add_sphere(dict(interop_data["emergentLastKnownPos"], altitude=0), "cyan")
+
+    if not parsed_args.drop:
+        add_sphere(dict(interop_data["airDropPos"], altitude=0), "black")
+
+    if not parsed_args.obstacles:
+        for o in interop_data["stationaryObstacles"]:
+            x, y, *_ = cartesian.forward(o["latitude"], o["longitude"])
+            scene["cylinders"].append(
+                {
+                    "pos": [x, y, 0],
+                    "axis": [0, 0, o["height"]],
+                    "radius": feet_to_meters(o["radius"]),
+                    "color": "yellow",
+                    "opacity": 0.4,
+                }
+            )
+
+    if not parsed_args.autogen:
+        path = []
+        for a in interop_data["autogenPoints"]:
+            x, y, *_ = cartesian.forward(a["latitude"], a["longitude"])
+            path.append([x, y, a["altitude"]])
+        scene["curves"].append({"points": path, "radius": 10, "color": "white"})
+
+    if parsed_args.graph:
+        # Imported here as generating the graph is slow and only needed for this option
+        from run import construct_graph
+
+        # Progress output goes to stderr so a dump can be run headless
+        out = sys.stderr if parsed_args.dump else sys.stdout
+        with redirect_stdout(out):
+            g = construct_graph(
+                interop_data,
+                not parsed_args.drop,
+                not parsed_args.off_axis,
+                not parsed_args.obstacles,
+            )
+        for trail in edge_trails(g.graph.edges(), parsed_args.max_edges):
+            scene["curves"].append(
+                {"points": [list(n) for n in trail], "radius": 0, "color": "orange"}
+            )
+
+    return scene
+
+
+def dump_scene(scene, file):
+    """Writes the scene as compact JSON, rounding coordinates to a tenth of a meter.
+
+    Args:
+        scene (Dictionary): The scene from build_scene
+        file (str): Path of the output file
+    """
+
+    def compact(value):
+        if isinstance(value, float):
+            return round(value, 1)
+        if isinstance(value, list):
+            return [compact(v) for v in value]
+        if isinstance(value, dict):
+            return {k: compact(v) for k, v in value.items()}
+        return value
+
+    with open(file, "w") as output:
+        output.write(json.dumps(compact(scene), separators=(",", ":")))
+
+
+def load_scene(file):
+    """Reads a scene written by dump_scene.
+
+    Args:
+        file (str): Path of the scene file
+
+    Returns:
+        Dictionary: Lists of spheres, cylinders, extrusions and curves
+    """
+    with open(file, "r") as scene_file:
+        return json.load(scene_file)
+
+
+def max_edges_type(value):
+    """Argparse type for --max_edges, which can not be negative"""
+    value = int(value)
+    if value < 0:
+        raise argparse.ArgumentTypeError("must be 0 or more")
+    return value
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -38,101 +226,124 @@ if __name__ == "__main__":
     parser.add_argument(
         "--autogen", "-a", help="Show autogen path", action="store_true"
     )
+    parser.add_argument(
+        "--graph",
+        "-g",
+        help="Generate the SUASGraph and show its edges",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--max_edges",
+        "-m",
+        help="Maximum number of graph edges to show, 0 shows all",
+        type=max_edges_type,
+        default=5000,
+    )
+    parser.add_argument(
+        "--fast",
+        help="Batch geometry into a few objects for large scenes",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--dump",
+        help="Write the scene to a JSON file instead of rendering it",
+    )
+    parser.add_argument(
+        "--load",
+        help="Render a scene JSON file written by --dump instead of the interop file",
+    )
     parsed_args = parser.parse_args()
 
-    with open(parsed_args.file, "r") as json_file:
-        interop_data = json.load(json_file)
+    if parsed_args.load:
+        scene_data = load_scene(parsed_args.load)
+    else:
+        with open(parsed_args.file, "r") as json_file:
+            interop_data = json.load(json_file)
 
-    cartesian = EcefCartesian(
-        interop_data["lostCommsPos"]["latitude"],
-        interop_data["lostCommsPos"]["longitude"],
-    )
+        scene_data = build_scene(interop_data, parsed_args)
 
-    if not parsed_args.lost_comms:
-        lcp_x, lcp_y, *_ = cartesian.forward(
-            interop_data["lostCommsPos"]["latitude"],
-            interop_data["lostCommsPos"]["longitude"],
-        )
-        sphere(pos=vector(lcp_x, lcp_y, 0), radius=25, color=color.red)
+    if parsed_args.dump:
+        # Headless output, VPython is not needed
+        dump_scene(scene_data, parsed_args.dump)
+        sys.exit()
 
-    if not parsed_args.boundaries:
-        bounds = []
-        for b in interop_data["flyZones"][0]["boundaryPoints"]:
-            x, y, *_ = cartesian.forward(b["latitude"], b["longitude"])
-            bounds.append((x, y, 0))
-        pb = shapes.points(pos=bounds)
-        extrusion(
-            path=[vec(0, 0, interop_data["flyZones"][0]["altitudeMax"]), vec(0, 0, 0)],
-            shape=pb,
-            color=color.red,
-            opacity=0.4,
-        )
+    from vpython import (
+        color,
+        compound,
+        curve,
+        cylinder,
+        extrusion,
+        points,
+        shapes,
+        sphere,
+        vector,
+    )
 
-    if not parsed_args.waypoints:
-        for w in interop_data["waypoints"]:
-            way_x, way_y, *_ = cartesian.forward(w["latitude"], w["longitude"])
-            sphere(
-                pos=vector(way_x, way_y, w["altitude"]), radius=25, color=color.green
-            )
+    def vec_of(p):
+        return vector(*p)
 
-    if not parsed_args.search_grid:
-        sg = []
-        for s in interop_data["searchGridPoints"]:
-            x, y, *_ = cartesian.forward(s["latitude"], s["longitude"])
-            sg.append((x, y, 0))
-        psg = shapes.points(pos=sg)
+    for e in scene_data["extrusions"]:
         extrusion(
-            path=[vec(0, 0, 0), vec(0, 0, -1)], shape=psg, color=color.blue, opacity=0.4
-        )
-
-    if not parsed_args.off_axis:
-        oa_x, oa_y, *_ = cartesian.forward(
-            interop_data["offAxisOdlcPos"]["latitude"],
-            interop_data["offAxisOdlcPos"]["longitude"],
-        )
-        sphere(pos=vector(oa_x, oa_y, 0), radius=25, color=color.purple)
-
-    if not parsed_args.emergentLKP:
-        elkp_x, elkp_y, *_ = cartesian.forward(
-            interop_data["emergentLastKnownPos"]["latitude"],
-            interop_data["emergentLastKnownPos"]["longitude"],
-        )
-        sphere(pos=vector(elkp_x, elkp_y, 0), radius=25, color=color.cyan)
-
-    if not parsed_args.drop:
-        drop_x, drop_y, *_ = cartesian.forward(
-            interop_data["airDropPos"]["latitude"],
-            interop_data["airDropPos"]["longitude"],
+            path=[vec_of(p) for p in e["path"]],
+            shape=shapes.points(pos=e["shape"]),
+            color=getattr(color, e["color"]),
+            opacity=e["opacity"],
         )
-        sphere(pos=vector(drop_x, drop_y, 0), radius=25, color=color.black)
 
-    if not parsed_args.obstacles:
-        for o in interop_data["stationaryObstacles"]:
-            x, y, *_ = cartesian.forward(o["latitude"], o["longitude"])
-            cylinder(
-                pos=vector(x, y, 0),
-                axis=vector(0, 0, o["height"]),
-                radius=feet_to_meters(o["radius"]),
-                color=color.yellow,
-                opacity=0.4,
+    if parsed_args.fast:
+        # One points object per color instead of a sphere for each point
+        colors = {}
+        for s in scene_data["spheres"]:
+            key = (s["color"], s["radius"])
+            colors.setdefault(key, []).append(vec_of(s["pos"]))
+        for (c, r), pos in colors.items():
+            points(pos=pos, radius=r, size_units="world", color=getattr(color, c))
+        if scene_data["cylinders"]:
+            compound(
+                [
+                    cylinder(
+                        pos=vec_of(c["pos"]),
+                        axis=vec_of(c["axis"]),
+                        radius=c["radius"],
+                        color=getattr(color, c["color"]),
+                    )
+                    for c in scene_data["cylinders"]
+                ],
+                opacity=scene_data["cylinders"][0]["opacity"],
             )
-
-    if not parsed_args.autogen:
-        circ = shapes.circle(radius=10)
-        for i in range(len(interop_data["autogenPoints"]) - 1):
-            x1, y1, *_ = cartesian.forward(
-                interop_data["autogenPoints"][i]["latitude"],
-                interop_data["autogenPoints"][i]["longitude"],
+        # One curve for each path or graph trail
+        for c in scene_data["curves"]:
+            curve(
+                pos=[vec_of(p) for p in c["points"]],
+                radius=c["radius"],
+                color=getattr(color, c["color"]),
             )
-            x2, y2, *_ = cartesian.forward(
-                interop_data["autogenPoints"][i + 1]["latitude"],
-                interop_data["autogenPoints"][i + 1]["longitude"],
+    else:
+        for s in scene_data["spheres"]:
+            sphere(
+                pos=vec_of(s["pos"]),
+                radius=s["radius"],
+                color=getattr(color, s["color"]),
             )
-            extrusion(
-                path=[
-                    vec(x1, y1, interop_data["autogenPoints"][i]["altitude"]),
-                    vec(x2, y2, interop_data["autogenPoints"][i + 1]["altitude"]),
-                ],
-                shape=circ,
-                color=color.white,
+        for c in scene_data["cylinders"]:
+            cylinder(
+                pos=vec_of(c["pos"]),
+                axis=vec_of(c["axis"]),
+                radius=c["radius"],
+                color=getattr(color, c["color"]),
+                opacity=c["opacity"],
             )
+        for c in scene_data["curves"]:
+            if c["radius"] == 0:
+                curve(
+                    pos=[vec_of(p) for p in c["points"]],
+                    color=getattr(color, c["color"]),
+                )
+                continue
+            circ = shapes.circle(radius=c["radius"])
+            for i in range(len(c["points"]) - 1):
+                extrusion(
+                    path=[vec_of(c["points"][i]), vec_of(c["points"][i + 1])],
+                    shape=circ,
+                    color=getattr(color, c["color"]),
+                )